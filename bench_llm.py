@@ -0,0 +1,144 @@
+import argparse
+import asyncio
+import importlib.util
+import json
+import os
+import statistics
+import time
+
+import uvicorn
+from fastmcp import Client
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class StubStats:
+    def __init__(self):
+        self.requests = 0
+        self.connections = set()
+
+
+def _stub_app(stats: StubStats, tokens: int, token_delay: float) -> Starlette:
+    """Minimal OpenAI-compatible /chat/completions that streams `tokens` chunks."""
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stats.requests += 1
+        if request.client:
+            stats.connections.add((request.client.host, request.client.port))
+        prompt = body["messages"][-1]["content"]
+        words = [f"{prompt}#{i} " for i in range(tokens)]
+        base = {"id": f"stub-{stats.requests}", "created": int(time.time()), "model": body.get("model", "")}
+
+        if not body.get("stream"):
+            await asyncio.sleep(token_delay * tokens)
+            return JSONResponse({
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "".join(words)}}],
+            })
+
+        async def events():
+            for word in words:
+                await asyncio.sleep(token_delay)
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": {"content": word}, "finish_reason": None}]}
+                yield f"data: {json.dumps(chunk)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return Starlette(routes=[Route("/v1/chat/completions", chat_completions, methods=["POST"])])
+
+
+def _load_mcp_server():
+    spec = importlib.util.spec_from_file_location("mcp_server", os.path.join(ROOT, "mcp", "mcp_server.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _ms(seconds: float) -> float:
+    return seconds * 1000
+
+
+async def _timed_call(client: Client, arguments: dict, progress: list) -> float:
+    async def on_progress(value: float, total: float | None, message: str | None):
+        progress.append(value)
+
+    t0 = time.perf_counter()
+    result = await client.call_tool("call_deepseek", arguments, progress_handler=on_progress)
+    elapsed = _ms(time.perf_counter() - t0)
+    text = result.content[0].text
+    if text.startswith("Error during submit"):
+        raise RuntimeError(text)
+    return elapsed
+
+
+async def benchmark(port: int, concurrency: int, tokens: int, token_delay: float, cache_ttl: float):
+    stats = StubStats()
+    config = uvicorn.Config(_stub_app(stats, tokens, token_delay), host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+    os.environ["DEEPSEEK_CACHE_TTL"] = str(cache_ttl)
+    mcp_server = _load_mcp_server()
+
+    try:
+        async with Client(mcp_server.mcp) as client:
+            print(f"stub: http://127.0.0.1:{port}/v1 tokens={tokens} token_delay={_ms(token_delay):.1f}ms\n")
+
+            # Warm-up: imports openai and opens the shared client outside the measured runs.
+            await _timed_call(client, {"query": "warm-up"}, [])
+
+            progress = []
+            requests_before = stats.requests
+            latencies = await asyncio.gather(*(
+                _timed_call(client, {"query": "coalesce"}, progress) for _ in range(concurrency)
+            ))
+            print(f"Identical in-flight prompts x{concurrency}:")
+            print(f"  upstream_requests={stats.requests - requests_before} progress_notifications={len(progress)}")
+            print(f"  avg={statistics.mean(latencies):.2f}ms max={max(latencies):.2f}ms\n")
+
+            requests_before = stats.requests
+            latencies = await asyncio.gather(*(
+                _timed_call(client, {"query": f"distinct-{i}"}, []) for i in range(concurrency)
+            ))
+            print(f"Distinct prompts x{concurrency}:")
+            print(f"  upstream_requests={stats.requests - requests_before} connections_total={len(stats.connections)}")
+            print(f"  avg={statistics.mean(latencies):.2f}ms max={max(latencies):.2f}ms\n")
+
+            requests_before = stats.requests
+            cold = await _timed_call(client, {"query": "cached", "deterministic": True}, [])
+            warm = [await _timed_call(client, {"query": "cached", "deterministic": True}, []) for _ in range(concurrency)]
+            print(f"Deterministic prompt, cache_ttl={cache_ttl}s:")
+            print(f"  upstream_requests={stats.requests - requests_before}")
+            print(f"  cold={cold:.2f}ms warm_avg={statistics.mean(warm):.2f}ms")
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark call_deepseek against a local OpenAI-compatible stub.")
+    parser.add_argument("--port", type=int, default=18900, help="Stub server port")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent calls per scenario")
+    parser.add_argument("--tokens", type=int, default=20, help="Streamed chunks per completion")
+    parser.add_argument("--token-delay-ms", type=float, default=10.0, help="Delay between streamed chunks")
+    parser.add_argument("--cache-ttl", type=float, default=60.0, help="DEEPSEEK_CACHE_TTL for the run (0 disables)")
+    args = parser.parse_args()
+    asyncio.run(benchmark(args.port, args.concurrency, args.tokens, args.token_delay_ms / 1000, args.cache_ttl))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack
+
+from fastmcp import Client
+from fastmcp.client.transports import SSETransport, StreamableHttpTransport
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Demo NodeA–D double as upstream stubs: node_id (as in mcp_config.json) -> (script, port)
+STUB_NODES = {
+    "nodeA": ("nodes/node_a/main.py", 18101),
+    "nodeB": ("nodes/node_b/main.py", 18102),
+    "nodeC": ("nodes/node_c/main.py", 18103),
+    "nodeD": ("nodes/node_d/main.py", 18104),
+}
+DEFAULT_GATEWAY_PORT = 18200
+REPLAYED_METHODS = {"tools/call", "tools/list"}
+
+
+def _ms(seconds: float) -> float:
+    return seconds * 1000
+
+
+def _p(samples, pct: int) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[pct - 1]
+
+
+def _load_log(paths: list[str]) -> list[dict]:
+    entries = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = json.loads(line)
+                if entry.get("method") in REPLAYED_METHODS:
+                    entries.append(entry)
+    entries.sort(key=lambda e: e["t"])
+    return entries
+
+
+def _spawn(script: str, port: int, extra_env: dict | None = None) -> subprocess.Popen:
+    env = dict(os.environ)
+    env["PYTHONWARNINGS"] = "ignore"
+    env["PORT"] = str(port)
+    env.pop("EDGE_MCP_RECORD", None)
+    env.update(extra_env or {})
+    return subprocess.Popen(
+        [sys.executable, script],
+        cwd=os.path.dirname(script),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"{url}: server exited with code {proc.returncode}")
+        try:
+            async with Client(url) as client:
+                await client.list_tools()
+            return
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"{url}: not ready within {timeout}s")
+            await asyncio.sleep(0.05)
+
+
+def _stub_config(path: str) -> None:
+    config = {
+        "mcpServers": {
+            node_id: {"url": f"http://127.0.0.1:{port}/mcp"}
+            for node_id, (_, port) in STUB_NODES.items()
+        }
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+def _label(entry: dict) -> str:
+    if entry["method"] == "tools/call":
+        return f"tools/call:{entry['params'].get('name', '')}"
+    return entry["method"]
+
+
+async def _issue(client: Client, entry: dict) -> bool:
+    if entry["method"] == "tools/list":
+        await client.list_tools()
+        return True
+    params = entry["params"]
+    result = await client.call_tool_mcp(params.get("name", ""), params.get("arguments") or {})
+    return not result.isError
+
+
+def _session_client(url: str, tenant_header: str, tenant: str | None) -> Client:
+    headers = {tenant_header: tenant} if tenant else None
+    if url.rstrip("/").endswith("/sse"):
+        return Client(SSETransport(url, headers=headers))
+    return Client(StreamableHttpTransport(url, headers=headers))
+
+
+async def replay(url: str, entries: list[dict], speed: float, concurrency: int, tenant_header: str) -> dict:
+    samples: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    lags = []
+    limit = asyncio.Semaphore(concurrency)
+    # One client per recorded session, re-sending its tenant header, so multi-agent
+    # traffic reaches the gateway as separate sessions/tenants.
+    tenants: dict[str | None, str | None] = {}
+    for entry in entries:
+        session = entry.get("session")
+        if tenants.get(session) is None:
+            tenants[session] = entry.get("tenant")
+    async with AsyncExitStack() as stack:
+        clients = {
+            session: await stack.enter_async_context(_session_client(url, tenant_header, tenant))
+            for session, tenant in tenants.items()
+        }
+        t_first = entries[0]["t"]
+        start = time.perf_counter()
+
+        async def run(entry: dict):
+            label = _label(entry)
+            if speed > 0:
+                due = start + (entry["t"] - t_first) / speed
+                await asyncio.sleep(max(0.0, due - time.perf_counter()))
+                lags.append(_ms(max(0.0, time.perf_counter() - due)))
+            async with limit:
+                t0 = time.perf_counter()
+                try:
+                    ok = await _issue(clients[entry.get("session")], entry)
+                except Exception:
+                    ok = False
+                samples.setdefault(label, []).append(_ms(time.perf_counter() - t0))
+            if not ok:
+                errors[label] = errors.get(label, 0) + 1
+
+        await asyncio.gather(*(run(entry) for entry in entries))
+        wall = time.perf_counter() - start
+
+    all_samples = [ms for values in samples.values() for ms in values]
+    return {
+        "url": url,
+        "wall_s": wall,
+        "throughput": len(entries) / wall if wall else 0.0,
+        "p50": _p(all_samples, 50),
+        "p95": _p(all_samples, 95),
+        "lag_p95": _p(lags, 95) if lags else 0.0,
+        "methods": {
+            label: {
+                "count": len(values),
+                "errors": errors.get(label, 0),
+                "avg": statistics.mean(values),
+                "p50": _p(values, 50),
+                "p95": _p(values, 95),
+            }
+            for label, values in sorted(samples.items())
+        },
+    }
+
+
+def _print_report(name: str, report: dict) -> None:
+    print(f"{name} ({report['url']}):")
+    print(
+        f"  wall={report['wall_s']:.2f}s throughput={report['throughput']:.1f}req/s "
+        f"p50={report['p50']:.2f}ms p95={report['p95']:.2f}ms schedule_lag_p95={report['lag_p95']:.2f}ms"
+    )
+    for label, stats in report["methods"].items():
+        print(
+            f"  {label:<32} count={stats['count']} errors={stats['errors']} "
+            f"avg={stats['avg']:.2f}ms p50={stats['p50']:.2f}ms p95={stats['p95']:.2f}ms"
+        )
+
+
+def _delta(a: float, b: float) -> str:
+    if not a:
+        return "n/a"
+    return f"{(b - a) / a * 100:+.1f}%"
+
+
+def _print_diff(names: list[str], base: dict, other: dict) -> None:
+    print(f"\n{names[1]} vs {names[0]}:")
+    print(f"  throughput {_delta(base['throughput'], other['throughput'])}")
+    print(f"  p50        {_delta(base['p50'], other['p50'])}")
+    print(f"  p95        {_delta(base['p95'], other['p95'])}")
+    for label, stats in base["methods"].items():
+        theirs = other["methods"].get(label)
+        if theirs:
+            print(f"  {label:<32} p50 {_delta(stats['p50'], theirs['p50'])} p95 {_delta(stats['p95'], theirs['p95'])}")
+
+
+async def benchmark(args) -> None:
+    entries = _load_log(args.log)
+    if not entries:
+        raise RuntimeError("no tools/call or tools/list entries in log")
+    span = entries[-1]["t"] - entries[0]["t"]
+    speed = "max" if args.speed == 0 else f"{args.speed:g}x"
+    sessions = len({entry.get("session") for entry in entries})
+    print(f"entries: {len(entries)} sessions: {sessions} recorded_span={span:.2f}s speed={speed}\n")
+
+    targets = [(url, url) for url in args.target]
+    procs = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            if args.build:
+                config_path = os.path.join(tmp, "mcp_config.json")
+                _stub_config(config_path)
+                for script, port in STUB_NODES.values():
+                    proc = _spawn(os.path.join(ROOT, script), port)
+                    procs.append(proc)
+                    await _wait_ready(f"http://127.0.0.1:{port}/mcp", proc)
+                for i, build in enumerate(args.build):
+                    port = args.gateway_port + i
+                    script = os.path.join(os.path.abspath(build), "mcp", "edge_gateway.py")
+                    proc = _spawn(script, port, {"EDGE_MCP_CONFIG": config_path})
+                    procs.append(proc)
+                    url = f"http://127.0.0.1:{port}/sse"
+                    await _wait_ready(url, proc)
+                    targets.append((build, url))
+
+            reports = []
+            for name, url in targets:
+                report = await replay(url, entries, args.speed, args.concurrency, args.tenant_header)
+                reports.append(report)
+                _print_report(name, report)
+            if len(reports) == 2:
+                _print_diff([name for name, _ in targets], reports[0], reports[1])
+        finally:
+            for proc in procs:
+                proc.kill()
+                proc.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded gateway traffic and compare builds.")
+    parser.add_argument("log", nargs="+", help="Recorder JSONL file(s) (EDGE_MCP_RECORD output, incl. rotated .1/.2)")
+    parser.add_argument("--target", action="append", default=[], help="Running gateway URL (e.g. http://localhost:8787/sse)")
+    parser.add_argument(
+        "--build",
+        action="append",
+        default=[],
+        help="Repo checkout whose mcp/edge_gateway.py is started against stub NodeA-D (repeat to compare)",
+    )
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed (1, 10, ...; 0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=64, help="Max requests in flight")
+    parser.add_argument("--tenant-header", default="x-tenant-id", help="Header used to re-send recorded tenants")
+    parser.add_argument("--gateway-port", type=int, default=DEFAULT_GATEWAY_PORT, help="First port for --build gateways")
+    args = parser.parse_args()
+    if not args.target and not args.build:
+        args.build = [ROOT]
+    asyncio.run(benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
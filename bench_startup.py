@@ -0,0 +1,199 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from fastmcp import Client
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, transport, default port)
+SERVERS = {
+    "gateway": ("mcp/edge_gateway.py", "sse", 18787),
+    "node_a": ("nodes/node_a/main.py", "http", 18001),
+    "node_b": ("nodes/node_b/main.py", "http", 18002),
+    "node_c": ("nodes/node_c/main.py", "http", 18003),
+    "node_d": ("nodes/node_d/main.py", "http", 18004),
+    "mcp_server": ("mcp/mcp_server.py", "stdio", None),
+}
+
+
+def _ms(seconds: float) -> float:
+    return seconds * 1000
+
+
+def _rss_mb(pid: int) -> float | None:
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    try:
+        import psutil
+    except ImportError:
+        return None
+    try:
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except psutil.Error:
+        return None
+
+
+async def _wait_tools_list_http(url: str, proc: subprocess.Popen, timeout: float) -> int:
+    deadline = time.perf_counter() + timeout
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            async with Client(url, timeout=timeout) as client:
+                tools = await client.list_tools()
+            return len(tools)
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"no tools/list response from {url} within {timeout}s")
+            await asyncio.sleep(0.02)
+
+
+def _stdio_send(proc: subprocess.Popen, message: dict) -> None:
+    proc.stdin.write((json.dumps(message) + "\n").encode("utf-8"))
+    proc.stdin.flush()
+
+
+def _stdio_read(proc: subprocess.Popen, request_id: int) -> dict:
+    while True:
+        line = proc.stdout.readline()
+        if not line:
+            raise RuntimeError(f"server exited with code {proc.wait()}")
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if data.get("id") == request_id:
+            return data
+
+
+def _wait_tools_list_stdio(proc: subprocess.Popen) -> int:
+    _stdio_send(proc, {
+        "jsonrpc": "2.0",
+        "id": 1,
+        "method": "initialize",
+        "params": {
+            "protocolVersion": "2025-06-18",
+            "capabilities": {},
+            "clientInfo": {"name": "bench-startup", "version": "0"},
+        },
+    })
+    _stdio_read(proc, 1)
+    _stdio_send(proc, {"jsonrpc": "2.0", "method": "notifications/initialized"})
+    _stdio_send(proc, {"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}})
+    data = _stdio_read(proc, 2)
+    if "error" in data:
+        raise RuntimeError(f"mcp error: {data['error']}")
+    return len(data["result"]["tools"])
+
+
+async def measure(name: str, timeout: float) -> dict:
+    script, transport, port = SERVERS[name]
+    env = dict(os.environ)
+    env["PYTHONWARNINGS"] = "ignore"
+    if port is not None:
+        env["PORT"] = str(port)
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.join(ROOT, script)],
+        cwd=ROOT,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE if transport == "stdio" else subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        if transport == "stdio":
+            try:
+                # Killing the process in `finally` unblocks the reader thread on timeout.
+                tool_count = await asyncio.wait_for(asyncio.to_thread(_wait_tools_list_stdio, proc), timeout)
+            except asyncio.TimeoutError:
+                raise RuntimeError(f"no tools/list response from {name} within {timeout}s")
+        else:
+            path = "/sse" if transport == "sse" else "/mcp"
+            url = f"http://127.0.0.1:{port}{path}"
+            tool_count = await _wait_tools_list_http(url, proc, timeout)
+        ready_ms = _ms(time.perf_counter() - t0)
+        rss = _rss_mb(proc.pid)
+    finally:
+        proc.kill()
+        proc.wait()
+    return {"ready_ms": ready_ms, "rss_mb": rss, "tools": tool_count}
+
+
+def _summarize(samples: list[dict]) -> dict:
+    rss = [s["rss_mb"] for s in samples if s["rss_mb"] is not None]
+    return {
+        "ready_ms": statistics.median(s["ready_ms"] for s in samples),
+        "rss_mb": statistics.median(rss) if rss else None,
+        "tools": samples[-1]["tools"],
+    }
+
+
+def _regressions(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for key in ("ready_ms", "rss_mb"):
+            if current.get(key) is None or base.get(key) is None:
+                continue
+            limit = base[key] * (1 + tolerance)
+            if current[key] > limit:
+                failures.append(f"{name} {key}={current[key]:.2f} > {limit:.2f} (baseline {base[key]:.2f})")
+    return failures
+
+
+async def benchmark(names: list[str], runs: int, timeout: float) -> dict:
+    results = {}
+    for name in names:
+        samples = [await measure(name, timeout) for _ in range(runs)]
+        results[name] = _summarize(samples)
+        r = results[name]
+        rss = f"{r['rss_mb']:.1f}MB" if r["rss_mb"] is not None else "n/a"
+        print(f"  {name:<11} ready={r['ready_ms']:.2f}ms rss={rss} tools={r['tools']}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark gateway/node startup (time-to-first tools/list and RSS).")
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=list(SERVERS), help="Servers to measure")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per server (median is reported)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for the first tools/list")
+    parser.add_argument("--save", help="Write results to this JSON file (use as a later --baseline)")
+    parser.add_argument("--baseline", help="Compare against a JSON file written by --save")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative regression vs baseline")
+    args = parser.parse_args()
+
+    print(f"runs: {args.runs}\n")
+    results = asyncio.run(benchmark(args.servers, args.runs, args.timeout))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = _regressions(results, baseline, args.tolerance)
+        if failures:
+            print(f"\nStartup regression (tolerance {args.tolerance:.0%}):")
+            for failure in failures:
+                print(f"  {failure}")
+            sys.exit(1)
+        print(f"\nNo startup regression (tolerance {args.tolerance:.0%}).")
+
+
+if __name__ == "__main__":
+    main()
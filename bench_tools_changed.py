@@ -0,0 +1,188 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import uvicorn
+from fastmcp import Client, FastMCP
+from fastmcp.client.messages import MessageHandler
+from fastmcp.server.middleware import Middleware, MiddlewareContext
+
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+NODE_ID = "hotNode"
+
+
+def _ms(seconds: float) -> float:
+    return seconds * 1000
+
+
+def _p95(samples):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[94]
+
+
+class SessionBroadcast(Middleware):
+    """Track node sessions so a hot-added tool can be announced to all of them."""
+
+    def __init__(self):
+        self.sessions = set()
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        ctx = context.fastmcp_context
+        if ctx is not None and ctx.request_context is not None:
+            self.sessions.add(ctx.session)
+        return await call_next(context)
+
+    async def tool_list_changed(self):
+        for session in list(self.sessions):
+            try:
+                await session.send_tool_list_changed()
+            except Exception:
+                self.sessions.discard(session)
+
+
+def _hot_node() -> tuple[FastMCP, SessionBroadcast]:
+    node = FastMCP("HotNode", instructions="Demo node whose tool list changes at runtime.")
+    broadcast = SessionBroadcast()
+    node.add_middleware(broadcast)
+
+    @node.tool
+    def echo(text: str) -> dict:
+        """Echo the given text."""
+        return {"text": text}
+
+    return node, broadcast
+
+
+def _add_tool(node: FastMCP, name: str) -> None:
+    def hot_tool() -> dict:
+        return {"tool": name}
+
+    node.tool(name=name, description=f"Hot-added tool {name}.")(hot_tool)
+
+
+class ListChangedWaiter(MessageHandler):
+    def __init__(self):
+        self.event = asyncio.Event()
+
+    async def on_tool_list_changed(self, message):
+        self.event.set()
+
+
+async def _wait_ready(url: str, proc: subprocess.Popen, timeout: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while True:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gateway exited with code {proc.returncode}")
+        try:
+            async with Client(url) as client:
+                await client.list_tools()
+            return
+        except Exception:
+            if time.perf_counter() > deadline:
+                raise RuntimeError(f"{url}: not ready within {timeout}s")
+            await asyncio.sleep(0.05)
+
+
+async def _node_tool_names(client: Client) -> set[str]:
+    result = await client.call_tool("list_node_tools", {"node_id": NODE_ID})
+    return {tool["name"] for tool in result.structured_content["tools"]}
+
+
+async def benchmark(node_port: int, gateway_port: int, rounds: int, ttl: int, timeout: float) -> list[float]:
+    node, broadcast = _hot_node()
+    config = uvicorn.Config(
+        node.http_app(path="/mcp", stateless_http=False), host="127.0.0.1", port=node_port, log_level="warning"
+    )
+    node_server = uvicorn.Server(config)
+    node_task = asyncio.create_task(node_server.serve())
+    while not node_server.started:
+        await asyncio.sleep(0.01)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config_path = os.path.join(tmp, "mcp_config.json")
+        with open(config_path, "w", encoding="utf-8") as f:
+            json.dump({"mcpServers": {NODE_ID: {"url": f"http://127.0.0.1:{node_port}/mcp", "watch": True}}}, f)
+        env = dict(os.environ)
+        env.update(
+            PORT=str(gateway_port),
+            PYTHONWARNINGS="ignore",
+            EDGE_MCP_CONFIG=config_path,
+            NODE_TOOLS_CACHE_TTL=str(ttl),
+        )
+        proc = subprocess.Popen(
+            [sys.executable, os.path.join(ROOT, "mcp", "edge_gateway.py")],
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        url = f"http://127.0.0.1:{gateway_port}/sse"
+        notify_ms = []
+        visible_ms = []
+        try:
+            await _wait_ready(url, proc)
+            waiter = ListChangedWaiter()
+            async with Client(url, message_handler=waiter) as client:
+                # Wait until the gateway's subscription to the node is up.
+                deadline = time.perf_counter() + timeout
+                while len(broadcast.sessions) < 1 and time.perf_counter() < deadline:
+                    await asyncio.sleep(0.05)
+                await _node_tool_names(client)
+                print(f"gateway: {url} node: http://127.0.0.1:{node_port}/mcp fallback_ttl={ttl}s\n")
+
+                for i in range(rounds):
+                    name = f"hot_tool_{i}"
+                    waiter.event.clear()
+                    t0 = time.perf_counter()
+                    _add_tool(node, name)
+                    await broadcast.tool_list_changed()
+
+                    await asyncio.wait_for(waiter.event.wait(), timeout)
+                    notify_ms.append(_ms(time.perf_counter() - t0))
+                    while name not in await _node_tool_names(client):
+                        if time.perf_counter() - t0 > timeout:
+                            raise RuntimeError(f"{name} not visible through gateway within {timeout}s")
+                        await asyncio.sleep(0.005)
+                    visible_ms.append(_ms(time.perf_counter() - t0))
+        finally:
+            proc.kill()
+            proc.wait()
+            node_server.should_exit = True
+            await node_task
+
+    print(f"Hot-added tools x{rounds}:")
+    print(
+        f"  client list_changed  avg={statistics.mean(notify_ms):.2f}ms "
+        f"p95={_p95(notify_ms):.2f}ms max={max(notify_ms):.2f}ms"
+    )
+    print(
+        f"  visible via gateway  avg={statistics.mean(visible_ms):.2f}ms "
+        f"p95={_p95(visible_ms):.2f}ms max={max(visible_ms):.2f}ms"
+    )
+    return visible_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure tools/list_changed propagation through the gateway.")
+    parser.add_argument("--node-port", type=int, default=18401, help="Port for the in-process hot node")
+    parser.add_argument("--gateway-port", type=int, default=18402, help="Port for the gateway under test")
+    parser.add_argument("--rounds", type=int, default=10, help="Tools to hot-add")
+    parser.add_argument("--ttl", type=int, default=30, help="NODE_TOOLS_CACHE_TTL (fallback) for the gateway")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Seconds to wait for each change")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if any change takes longer to become visible")
+    args = parser.parse_args()
+    visible_ms = asyncio.run(benchmark(args.node_port, args.gateway_port, args.rounds, args.ttl, args.timeout))
+    if args.max_ms is not None and max(visible_ms) > args.max_ms:
+        print(f"\nPropagation slower than {args.max_ms:.0f}ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
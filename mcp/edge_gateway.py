@@ -1,11 +1,61 @@
 import asyncio
+import atexit
+import heapq
+import itertools
 import json
+import logging
 import os
+import queue
+import random
+import statistics
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, nullcontext
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from typing import Any
 
-from fastmcp import Client, FastMCP
+import pydantic_core
+from fastmcp import Client, Context, FastMCP
+from fastmcp.client.messages import MessageHandler
+from fastmcp.server.dependencies import get_http_headers
+from fastmcp.server.middleware import Middleware, MiddlewareContext
 
-mcp = FastMCP("edge-mcp-gateway")
+DEFAULT_RECORD_SAMPLE = 1.0
+DEFAULT_RECORD_MAX_BYTES = 10 * 1024 * 1024
+DEFAULT_RECORD_BACKUPS = 5
+
+DEFAULT_TENANT_HEADER = "x-tenant-id"
+DEFAULT_TENANT = "anonymous"
+DEFAULT_UPSTREAM_CONCURRENCY = 16
+DEFAULT_TENANT_POLICY = {"weight": 1.0, "maxConcurrency": 4, "priority": "normal"}
+PRIORITY_CLASSES = {"high": 0, "normal": 1, "low": 2}
+WAIT_SAMPLES = 1024
+TENANT_IDLE_TTL = 300
+
+DEFAULT_NODE_TOOLS_CACHE_TTL = 30
+DEFAULT_NODE_TOOLS_PUSH_CACHE_TTL = 300
+DEFAULT_WATCH_RETRY_MAX = 30
+
+logger = logging.getLogger("edge_gateway")
+
+
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    watchers = []
+    if os.getenv("EDGE_MCP_WATCH_NODES", "1") != "0":
+        # Watching is opt-in per node: stdio nodes would otherwise become permanent
+        # child processes, and stateless HTTP nodes cannot push notifications.
+        watchers = [NodeWatcher(node_id) for node_id, cfg in _node_entries().items() if cfg.get("watch")]
+    try:
+        yield {}
+    finally:
+        for watcher in watchers:
+            watcher.task.cancel()
+        await asyncio.gather(*(w.task for w in watchers), return_exceptions=True)
+
+
+mcp = FastMCP("edge-mcp-gateway", lifespan=_lifespan)
 
 
 def _config_path() -> str:
@@ -35,12 +85,12 @@ def _node_meta(node_id: str, cfg: dict) -> dict:
     }
 
 
-def _client_for_node(node_id: str) -> Client:
+def _client_for_node(node_id: str, **kwargs: Any) -> Client:
     nodes = _node_entries()
     if node_id not in nodes:
         raise ValueError(f"unknown node: {node_id}")
     config = {"mcpServers": {node_id: nodes[node_id]}}
-    return Client(config)
+    return Client(config, **kwargs)
 
 
 def _tool_to_dict(tool: Any) -> dict:
@@ -69,6 +119,361 @@ def _extract_tool_result(result: Any) -> Any:
     return content
 
 
+class FairScheduler:
+    """Weighted fair queuing of upstream calls across tenants.
+
+    Each tenant has a FIFO of waiting requests tagged with a self-clocked
+    fair-queuing finish tag (cost 1 / tenant weight). Only the head of each
+    tenant that is under its concurrency quota sits in the ready heap, ordered
+    by priority class and then finish tag, so a tenant at its quota costs
+    nothing per dispatch. Idle tenants that are not configured are forgotten
+    after TENANT_IDLE_TTL seconds.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        default_policy: dict,
+        tenants: dict[str, dict],
+        tenant_header: str = DEFAULT_TENANT_HEADER,
+    ):
+        if int(max_concurrency) < 1:
+            raise ValueError("scheduler maxConcurrency must be >= 1")
+        self.max_concurrency = int(max_concurrency)
+        self.tenant_header = tenant_header.lower()
+        self.default_policy = self._validate("default", {**DEFAULT_TENANT_POLICY, **default_policy})
+        self.tenants = {
+            name: self._validate(name, {**self.default_policy, **policy})
+            for name, policy in tenants.items()
+        }
+        self._queues: dict[str, deque] = {}
+        self._ready: list[tuple] = []
+        self._in_ready: set[str] = set()
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._last_finish: dict[str, float] = {}
+        self._in_flight: dict[str, int] = {}
+        self._total_in_flight = 0
+        self._waits: dict[str, deque] = {}
+        self._completed: dict[str, int] = {}
+        self._last_seen: dict[str, float] = {}
+        self._next_sweep = time.monotonic() + TENANT_IDLE_TTL
+
+    @staticmethod
+    def _validate(name: str, policy: dict) -> dict:
+        if float(policy["weight"]) <= 0:
+            raise ValueError(f"scheduler tenant {name!r}: weight must be > 0")
+        if int(policy["maxConcurrency"]) < 1:
+            raise ValueError(f"scheduler tenant {name!r}: maxConcurrency must be >= 1")
+        if policy["priority"] not in PRIORITY_CLASSES:
+            raise ValueError(
+                f"scheduler tenant {name!r}: priority must be one of {sorted(PRIORITY_CLASSES)}"
+            )
+        return {
+            "weight": float(policy["weight"]),
+            "maxConcurrency": int(policy["maxConcurrency"]),
+            "priority": policy["priority"],
+        }
+
+    def policy(self, tenant: str) -> dict:
+        return self.tenants.get(tenant, self.default_policy)
+
+    @asynccontextmanager
+    async def slot(self, tenant: str):
+        policy = self.policy(tenant)
+        start = max(self._virtual_time, self._last_finish.get(tenant, 0.0))
+        finish = start + 1 / policy["weight"]
+        self._last_finish[tenant] = finish
+        self._last_seen[tenant] = time.monotonic()
+        granted = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(tenant, deque()).append((finish, granted))
+        t0 = time.perf_counter()
+        self._mark_ready(tenant)
+        self._dispatch()
+        try:
+            await granted
+        except asyncio.CancelledError:
+            if granted.done() and not granted.cancelled():
+                self._release(tenant)
+            raise
+        self._waits.setdefault(tenant, deque(maxlen=WAIT_SAMPLES)).append(
+            (time.perf_counter() - t0) * 1000
+        )
+        try:
+            yield
+        finally:
+            self._completed[tenant] = self._completed.get(tenant, 0) + 1
+            self._release(tenant)
+
+    def _head(self, tenant: str) -> tuple | None:
+        waiting = self._queues.get(tenant)
+        while waiting and waiting[0][1].done():
+            waiting.popleft()
+        if not waiting:
+            self._queues.pop(tenant, None)
+            return None
+        return waiting[0]
+
+    def _mark_ready(self, tenant: str) -> None:
+        if tenant in self._in_ready:
+            return
+        if self._in_flight.get(tenant, 0) >= self.policy(tenant)["maxConcurrency"]:
+            return
+        head = self._head(tenant)
+        if head is None:
+            return
+        rank = PRIORITY_CLASSES[self.policy(tenant)["priority"]]
+        heapq.heappush(self._ready, (rank, head[0], next(self._seq), tenant))
+        self._in_ready.add(tenant)
+
+    def _dispatch(self) -> None:
+        while self._ready and self._total_in_flight < self.max_concurrency:
+            _, finish, _, tenant = heapq.heappop(self._ready)
+            self._in_ready.discard(tenant)
+            head = self._head(tenant)
+            if head is None:
+                continue
+            if head[0] != finish:
+                # The tagged head was cancelled; requeue with the new head's tag.
+                self._mark_ready(tenant)
+                continue
+            self._queues[tenant].popleft()
+            self._virtual_time = max(self._virtual_time, finish)
+            self._in_flight[tenant] = self._in_flight.get(tenant, 0) + 1
+            self._total_in_flight += 1
+            head[1].set_result(None)
+            self._mark_ready(tenant)
+
+    def _release(self, tenant: str) -> None:
+        self._in_flight[tenant] -= 1
+        self._total_in_flight -= 1
+        self._last_seen[tenant] = time.monotonic()
+        self._mark_ready(tenant)
+        self._dispatch()
+        self._sweep()
+
+    def _sweep(self) -> None:
+        now = time.monotonic()
+        if now < self._next_sweep:
+            return
+        self._next_sweep = now + TENANT_IDLE_TTL
+        for tenant, seen in list(self._last_seen.items()):
+            if tenant in self.tenants or now - seen < TENANT_IDLE_TTL:
+                continue
+            if self._in_flight.get(tenant, 0) or self._head(tenant) is not None:
+                continue
+            for table in (self._last_seen, self._last_finish, self._in_flight, self._waits, self._completed):
+                table.pop(tenant, None)
+
+    def stats(self) -> dict:
+        tenants = {}
+        for tenant in sorted(self._last_seen):
+            waits = list(self._waits.get(tenant, ()))
+            queued = sum(1 for _, granted in self._queues.get(tenant, ()) if not granted.done())
+            tenants[tenant] = {
+                **self.policy(tenant),
+                "queued": queued,
+                "in_flight": self._in_flight.get(tenant, 0),
+                "completed": self._completed.get(tenant, 0),
+                "wait_ms_avg": round(statistics.mean(waits), 3) if waits else 0.0,
+                "wait_ms_p95": round(_p95(waits), 3) if waits else 0.0,
+                "wait_ms_max": round(max(waits), 3) if waits else 0.0,
+            }
+        return {
+            "enabled": True,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": self._total_in_flight,
+            "tenants": tenants,
+        }
+
+
+def _p95(samples: list[float]) -> float:
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[94]
+
+
+_scheduler: FairScheduler | None = None
+_scheduler_loaded = False
+
+
+def _scheduler_config() -> dict:
+    return _load_config().get("scheduler", {})
+
+
+def _get_scheduler() -> FairScheduler | None:
+    """Return the scheduler, or None when the config has no "scheduler" block.
+
+    Called once before the server starts so an invalid policy stops the process.
+    """
+    global _scheduler, _scheduler_loaded
+    if not _scheduler_loaded:
+        config = _load_config().get("scheduler")
+        if config is not None:
+            _scheduler = FairScheduler(
+                config.get("maxConcurrency", DEFAULT_UPSTREAM_CONCURRENCY),
+                config.get("default", {}),
+                config.get("tenants", {}),
+                config.get("tenantHeader", DEFAULT_TENANT_HEADER),
+            )
+        _scheduler_loaded = True
+    return _scheduler
+
+
+def _upstream_slot(ctx: Context | None):
+    scheduler = _get_scheduler()
+    if scheduler is None:
+        return nullcontext()
+    return scheduler.slot(_tenant_id(ctx, scheduler.tenant_header))
+
+
+def _tenant_header() -> str:
+    return _scheduler_config().get("tenantHeader", DEFAULT_TENANT_HEADER).lower()
+
+
+def _session_id(ctx: Context | None) -> str | None:
+    if ctx is None:
+        return None
+    try:
+        return ctx.session_id
+    except RuntimeError:
+        return None
+
+
+def _tenant_id(ctx: Context | None, tenant_header: str) -> str:
+    tenant = get_http_headers().get(tenant_header)
+    if tenant:
+        return tenant
+    return _session_id(ctx) or DEFAULT_TENANT
+
+
+# node_id -> (expires_at, tools)
+_node_tools_cache: dict[str, tuple[float, list[dict]]] = {}
+# node_id -> count of list_changed notifications; guards request-path writes against stale fetches.
+_node_tools_generation: dict[str, int] = {}
+_watchers: dict[str, "NodeWatcher"] = {}
+_client_sessions: weakref.WeakSet = weakref.WeakSet()
+
+
+def _node_tools_ttl(node_id: str) -> float:
+    watcher = _watchers.get(node_id)
+    if watcher is not None and watcher.push_capable:
+        return float(os.getenv("NODE_TOOLS_PUSH_CACHE_TTL", DEFAULT_NODE_TOOLS_PUSH_CACHE_TTL))
+    return float(os.getenv("NODE_TOOLS_CACHE_TTL", DEFAULT_NODE_TOOLS_CACHE_TTL))
+
+
+def _watched(node_id: str) -> bool:
+    # Only nodes with a connected watcher are cached: nothing else would invalidate the entry.
+    watcher = _watchers.get(node_id)
+    return watcher is not None and watcher.client is not None
+
+
+def _cached_node_tools(node_id: str) -> list[dict] | None:
+    if not _watched(node_id):
+        return None
+    entry = _node_tools_cache.get(node_id)
+    if entry is None or entry[0] < time.monotonic():
+        return None
+    return entry[1]
+
+
+def _store_node_tools(node_id: str, tools: list[dict]) -> bool:
+    """Cache a node's tool list; return True if it differs from the previous one."""
+    previous = _node_tools_cache.get(node_id)
+    _node_tools_cache[node_id] = (time.monotonic() + _node_tools_ttl(node_id), tools)
+    return previous is not None and previous[1] != tools
+
+
+async def _notify_tools_changed() -> None:
+    for session in list(_client_sessions):
+        try:
+            await session.send_tool_list_changed()
+        except Exception:
+            _client_sessions.discard(session)
+
+
+class SessionTracker(Middleware):
+    """Remember connected gateway sessions so node tool changes can be pushed to them."""
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        ctx = context.fastmcp_context
+        if ctx is not None and ctx.request_context is not None:
+            _client_sessions.add(ctx.session)
+        return await call_next(context)
+
+
+class NodeWatcher(MessageHandler):
+    """Long-lived session to one node.
+
+    Refreshes the node's cached tool list as soon as it sends
+    notifications/tools/list_changed and forwards the change to gateway
+    clients. Once a node has pushed a change, its cache entries use the longer
+    push TTL, which then only bounds staleness if the subscription silently
+    breaks. The session is pinged every fallback TTL and reopened on failure.
+    """
+
+    def __init__(self, node_id: str):
+        self.node_id = node_id
+        self.client: Client | None = None
+        self.push_capable = False
+        self._dirty = False
+        self._refresh_task: asyncio.Task | None = None
+        _watchers[node_id] = self
+        self.task = asyncio.create_task(self._run())
+
+    async def on_tool_list_changed(self, message: Any) -> None:
+        self.push_capable = True
+        self._dirty = True
+        _node_tools_generation[self.node_id] = _node_tools_generation.get(self.node_id, 0) + 1
+        _node_tools_cache.pop(self.node_id, None)
+        # Requests cannot be awaited from inside the session's receive loop.
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+
+    async def _fetch(self) -> bool:
+        tools = await self.client.list_tools()
+        return _store_node_tools(self.node_id, [_tool_to_dict(t) for t in tools])
+
+    async def _refresh(self) -> None:
+        try:
+            while self._dirty and self.client is not None:
+                self._dirty = False
+                await self._fetch()
+        except Exception as e:
+            logger.debug("refresh of %s failed: %s", self.node_id, e)
+        await _notify_tools_changed()
+
+    async def _run(self) -> None:
+        backoff = 1
+        try:
+            while True:
+                try:
+                    async with _client_for_node(self.node_id, message_handler=self) as client:
+                        self.client = client
+                        backoff = 1
+                        # Changes missed while disconnected surface as a diff here.
+                        if await self._fetch():
+                            await _notify_tools_changed()
+                        while True:
+                            await asyncio.sleep(
+                                float(os.getenv("NODE_TOOLS_CACHE_TTL", DEFAULT_NODE_TOOLS_CACHE_TTL))
+                            )
+                            await client.ping()
+                except Exception as e:
+                    logger.debug("watch of %s failed: %s", self.node_id, e)
+                finally:
+                    self.client = None
+                    self.push_capable = False
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, DEFAULT_WATCH_RETRY_MAX)
+        finally:
+            if self._refresh_task is not None:
+                self._refresh_task.cancel()
+                await asyncio.gather(self._refresh_task, return_exceptions=True)
+            if _watchers.get(self.node_id) is self:
+                del _watchers[self.node_id]
+
+
 @mcp.tool
 def list_nodes() -> dict:
     nodes = _node_entries()
@@ -76,24 +481,153 @@ def list_nodes() -> dict:
 
 
 @mcp.tool
-async def list_node_tools(node_id: str) -> dict:
+async def list_node_tools(node_id: str, ctx: Context | None = None) -> dict:
     client = _client_for_node(node_id)
-    async with client:
-        tools = await client.list_tools()
-    return {"node": node_id, "tools": [_tool_to_dict(t) for t in tools]}
+    cached = _cached_node_tools(node_id)
+    if cached is not None:
+        return {"node": node_id, "tools": cached}
+    generation = _node_tools_generation.get(node_id, 0)
+    async with _upstream_slot(ctx):
+        async with client:
+            tools = await client.list_tools()
+    tools = [_tool_to_dict(t) for t in tools]
+    # Skip the store if the node pushed a change while this fetch was queued or in flight.
+    if _watched(node_id) and _node_tools_generation.get(node_id, 0) == generation:
+        if _store_node_tools(node_id, tools):
+            await _notify_tools_changed()
+    return {"node": node_id, "tools": tools}
 
 
 @mcp.tool
-async def call_node_tool(node_id: str, tool_name: str, arguments: dict | None = None) -> dict:
+async def call_node_tool(
+    node_id: str, tool_name: str, arguments: dict | None = None, ctx: Context | None = None
+) -> dict:
     args = arguments or {}
     if not isinstance(args, dict):
         return {"error": "invalid_arguments", "reason": "arguments must be an object"}
     client = _client_for_node(node_id)
-    async with client:
-        result = await client.call_tool(tool_name, args)
+    async with _upstream_slot(ctx):
+        async with client:
+            result = await client.call_tool(tool_name, args)
     return {"node": node_id, "tool_name": tool_name, "result": _extract_tool_result(result)}
 
 
+@mcp.tool
+def scheduler_stats() -> dict:
+    scheduler = _get_scheduler()
+    if scheduler is None:
+        return {"enabled": False}
+    return scheduler.stats()
+
+
+def _jsonable_fallback(value: Any) -> Any:
+    return getattr(value, "__dict__", str(value))
+
+
+def _request_params(message: Any) -> Any:
+    # tools/call hands middleware its params; other methods hand over the whole request.
+    if hasattr(message, "method"):
+        message = getattr(message, "params", None)
+    if message is None:
+        return {}
+    return pydantic_core.to_jsonable_python(
+        message, fallback=_jsonable_fallback, exclude_none=True
+    )
+
+
+class _RecordFormatter(logging.Formatter):
+    """Serialize a recorded request on the listener thread, off the event loop."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = record.entry
+        size = 0
+        if entry["ok"]:
+            size = len(pydantic_core.to_json(entry["result"], fallback=_jsonable_fallback))
+        line = {
+            "t": entry["t"],
+            "session": entry["session"],
+            "tenant": entry["tenant"],
+            "method": entry["method"],
+            "params": _request_params(entry["message"]),
+            "ms": entry["ms"],
+            "bytes": size,
+            "ok": entry["ok"],
+        }
+        return json.dumps(line, ensure_ascii=False, separators=(",", ":"))
+
+
+class _RecordQueueHandler(QueueHandler):
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The default prepare() formats in the calling thread; leave that to the listener.
+        return record
+
+
+class TrafficRecorder(Middleware):
+    """Append sampled JSON-RPC requests (session, tenant, params, timing, result size) to a rotating JSONL log.
+
+    Records go through a queue; serialization, disk writes and rotation happen
+    on a QueueListener thread.
+    """
+
+    def __init__(self, path: str, sample: float, max_bytes: int, backups: int, tenant_header: str):
+        self.sample = sample
+        self.tenant_header = tenant_header
+        self.logger = logging.getLogger(f"edge_gateway.recorder.{path}")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+        handler.setFormatter(_RecordFormatter())
+        records = queue.SimpleQueue()
+        self.logger.addHandler(_RecordQueueHandler(records))
+        self.listener = QueueListener(records, handler)
+        self.listener.start()
+        atexit.register(self.listener.stop)
+
+    async def on_request(self, context: MiddlewareContext, call_next):
+        if random.random() >= self.sample:
+            return await call_next(context)
+        started = time.time()
+        t0 = time.perf_counter()
+        ok = False
+        result = None
+        try:
+            result = await call_next(context)
+            ok = True
+            return result
+        finally:
+            entry = {
+                "t": round(started, 6),
+                "session": _session_id(context.fastmcp_context),
+                "tenant": get_http_headers().get(self.tenant_header),
+                "method": context.method,
+                "message": context.message,
+                "result": result,
+                "ms": round((time.perf_counter() - t0) * 1000, 3),
+                "ok": ok,
+            }
+            self.logger.info("", extra={"entry": entry})
+
+
+def _recorder_from_env() -> TrafficRecorder | None:
+    path = os.getenv("EDGE_MCP_RECORD")
+    if not path:
+        return None
+    return TrafficRecorder(
+        path,
+        sample=float(os.getenv("EDGE_MCP_RECORD_SAMPLE", DEFAULT_RECORD_SAMPLE)),
+        max_bytes=int(os.getenv("EDGE_MCP_RECORD_MAX_BYTES", DEFAULT_RECORD_MAX_BYTES)),
+        backups=int(os.getenv("EDGE_MCP_RECORD_BACKUPS", DEFAULT_RECORD_BACKUPS)),
+        tenant_header=_tenant_header(),
+    )
+
+
+mcp.add_middleware(SessionTracker())
+
+
 if __name__ == "__main__":
+    _get_scheduler()
+    recorder = _recorder_from_env()
+    if recorder:
+        mcp.add_middleware(recorder)
     port = int(os.getenv("PORT", "8787"))
     mcp.run(transport="sse", host="0.0.0.0", port=port)
@@ -1,13 +1,24 @@
-from fastmcp import FastMCP
-import arxiv
+from fastmcp import Context, FastMCP
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Union
-from openai import OpenAI
-from dotenv import load_dotenv
+import asyncio
 import os
-load_dotenv()
+import time
 
 mcp = FastMCP('local-arxiv-server')
 
+
+# Optional dependencies (arxiv / openai / dotenv) are imported inside the tools
+# so that starting the server and answering tools/list never loads them.
+@lru_cache(maxsize=None)
+def _load_env() -> None:
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        return
+    load_dotenv()
+
 @mcp.tool
 def arxiv_search(query: str, max_results: Union[int, str] = 5) -> str:
     """Searches for papers on arXiv. Useful for academic research."""
@@ -16,29 +27,158 @@ def arxiv_search(query: str, max_results: Union[int, str] = 5) -> str:
     except (ValueError, TypeError):
         max_results_int = 5
     try:
+        import arxiv
+
         search = arxiv.Search(query=query, max_results=max_results_int, sort_by=arxiv.SortCriterion.Relevance)
         results = [f"Title: {r.title}\nAuthors: {', '.join(a.name for a in r.authors)}\nPublished: {r.published.strftime('%Y-%m-%d')}\nSummary: {r.summary.replace('n', ' ')}\nURL: {r.entry_id}" for r in search.results()]
         return "\n---\n".join(results) if results else "No papers found."
     except Exception as e:
         return f"Error during arXiv search: {e}"
 
+DEFAULT_DEEPSEEK_MODEL = "deepseek-chat"
+DEFAULT_DEEPSEEK_CACHE_SIZE = 256
+
+# Requests for the same prompt that are already upstream: key -> (task, progress listeners).
+_inflight: dict[tuple, tuple[asyncio.Task, list[Context]]] = {}
+# Opt-in response cache for deterministic prompts: key -> (expires_at, text).
+_response_cache: OrderedDict[tuple, tuple[float, str]] = OrderedDict()
+
+
+@lru_cache(maxsize=None)
+def _llm_client():
+    from openai import AsyncOpenAI
+
+    _load_env()
+    # One shared client so the underlying httpx pool keeps connections alive across calls.
+    return AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"),
+                       base_url=os.getenv("OPENAI_BASE_URL"))
+
+
+def _cache_ttl() -> float:
+    _load_env()
+    try:
+        return float(os.getenv("DEEPSEEK_CACHE_TTL", "0"))
+    except ValueError:
+        return 0.0
+
+
+def _cache_size() -> int:
+    try:
+        return int(os.getenv("DEEPSEEK_CACHE_SIZE", DEFAULT_DEEPSEEK_CACHE_SIZE))
+    except ValueError:
+        return DEFAULT_DEEPSEEK_CACHE_SIZE
+
+
+def _cache_get(key: tuple) -> str | None:
+    entry = _response_cache.get(key)
+    if entry is None:
+        return None
+    expires_at, text = entry
+    if expires_at < time.monotonic():
+        _response_cache.pop(key, None)
+        return None
+    _response_cache.move_to_end(key)
+    return text
+
+
+def _cache_put(key: tuple, text: str, ttl: float) -> None:
+    _response_cache[key] = (time.monotonic() + ttl, text)
+    _response_cache.move_to_end(key)
+    while len(_response_cache) > _cache_size():
+        _response_cache.popitem(last=False)
+
+
+async def _stream_completion(key: tuple, listeners: list[Context]) -> str:
+    model, query, temperature = key
+    kwargs = {"temperature": temperature} if temperature is not None else {}
+    stream = await _llm_client().chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "user", "content": query}
+        ],
+        stream=True,
+        **kwargs,
+    )
+    parts = []
+    # id(ctx) -> progress notification still being sent to that listener.
+    sending: dict[int, asyncio.Task] = {}
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if not delta:
+                continue
+            parts.append(delta)
+            for ctx in list(listeners):
+                # Never await a listener here: a slow client skips updates instead of
+                # stalling the shared stream for every coalesced caller.
+                pending = sending.get(id(ctx))
+                if pending is None or pending.done():
+                    sending[id(ctx)] = asyncio.create_task(
+                        _send_progress(ctx, listeners, len(parts), delta)
+                    )
+    finally:
+        for pending in sending.values():
+            pending.cancel()
+    return "".join(parts)
+
+
+async def _send_progress(ctx: Context, listeners: list[Context], progress: int, message: str) -> None:
+    try:
+        await ctx.report_progress(progress=progress, message=message)
+    except Exception:
+        if ctx in listeners:
+            listeners.remove(ctx)
+
+
+def _finish_inflight(key: tuple, task: asyncio.Task) -> None:
+    _inflight.pop(key, None)
+    # Mark the exception retrieved in case every waiter was cancelled before it failed.
+    if not task.cancelled():
+        task.exception()
+
+
+async def _complete(query: str, deterministic: bool, ctx: Context | None) -> str:
+    _load_env()
+    model = os.getenv("DEEPSEEK_MODEL", DEFAULT_DEEPSEEK_MODEL)
+    key = (model, query, 0.0 if deterministic else None)
+    ttl = _cache_ttl() if deterministic else 0.0
+    if ttl > 0:
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+
+    inflight = _inflight.get(key)
+    if inflight is None:
+        listeners = []
+        task = asyncio.create_task(_stream_completion(key, listeners))
+        _inflight[key] = (task, listeners)
+        task.add_done_callback(lambda t: _finish_inflight(key, t))
+    else:
+        task, listeners = inflight
+    if ctx is not None:
+        listeners.append(ctx)
+    try:
+        # Shielded so one caller disconnecting does not cancel the shared upstream request.
+        text = await asyncio.shield(task)
+    finally:
+        if ctx in listeners:
+            listeners.remove(ctx)
+    if ttl > 0:
+        _cache_put(key, text, ttl)
+    return text
+
+
 @mcp.tool
-def call_deepseek(query: str) -> str:
-    """submit a query to deepseek"""
-    try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"),
-                        base_url=os.getenv("OPENAI_BASE_URL"))
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "user", "content": query}
-            ]
-        )
-        return response.choices[0].message.content
+async def call_deepseek(query: str, deterministic: bool = False, ctx: Context | None = None) -> str:
+    """submit a query to deepseek (deterministic=True uses temperature 0 and may be served from cache)"""
+    try:
+        return await _complete(query, deterministic, ctx)
     except Exception as e:
         return f"Error during submit to deepseek: {e}"
 
 
 
 if __name__ == "__main__":
-    mcp.run()
\ No newline at end of file
+    mcp.run()
@@ -1,6 +1,7 @@
 import asyncio
 import json
 import os
+import time
 import uuid
 
 
@@ -8,13 +9,15 @@ from dotenv import load_dotenv
 
 
 import httpx
-from openai import OpenAI
+from openai import AsyncOpenAI
 
 
 
 DEFAULT_MCP_URL = "http://localhost:8787/mcp"
 DEFAULT_OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 DEFAULT_OPENROUTER_MODEL = "openai/gpt-4o-mini"
+DEFAULT_MCP_TIMEOUT = 30
+DEFAULT_MCP_MAX_CONNECTIONS = 16
 
 
 def _tool_defs():
@@ -110,17 +113,55 @@ async def _mcp_request(
     return data["result"]
 
 
-async def _call_gateway_tool(mcp_url: str, tool_name: str, arguments: dict):
-    async with httpx.AsyncClient(timeout=30, trust_env=False) as client:
-        result = await _mcp_request(
-            client,
-            mcp_url,
-            "tools/call",
-            {"name": tool_name, "arguments": arguments},
-        )
+def _ms(seconds: float) -> float:
+    return seconds * 1000
+
+
+def _gateway_client() -> httpx.AsyncClient:
+    # One keep-alive pool for the whole agent run instead of a new connection per MCP call.
+    limits = httpx.Limits(
+        max_connections=DEFAULT_MCP_MAX_CONNECTIONS,
+        max_keepalive_connections=DEFAULT_MCP_MAX_CONNECTIONS,
+    )
+    return httpx.AsyncClient(timeout=DEFAULT_MCP_TIMEOUT, limits=limits, trust_env=False)
+
+
+async def _call_gateway_tool(
+    client: httpx.AsyncClient, mcp_url: str, tool_name: str, arguments: dict
+):
+    result = await _mcp_request(
+        client,
+        mcp_url,
+        "tools/call",
+        {"name": tool_name, "arguments": arguments},
+    )
     return _extract_content(result)
 
 
+async def _run_tool_call(client: httpx.AsyncClient, mcp_url: str, tool_call):
+    name = tool_call.function.name
+    args = tool_call.function.arguments
+    t0 = time.perf_counter()
+    try:
+        args = json.loads(args or "{}")
+        result = await _call_gateway_tool(client, mcp_url, name, args)
+    except Exception as e:
+        # One failing call becomes that call's tool message instead of aborting the turn.
+        result = {"error": "tool_call_failed", "reason": str(e)}
+    return name, args, result, _ms(time.perf_counter() - t0)
+
+
+def _print_turn_timing(turn: int, llm_ms: float, tools_ms: float, tool_timings: list):
+    print(f"\n--- Turn {turn} timing ---")
+    print(f"llm: {llm_ms:.2f}ms")
+    if tool_timings:
+        serial_ms = sum(ms for _, ms in tool_timings)
+        print(f"tools (wall): {tools_ms:.2f}ms (serial sum {serial_ms:.2f}ms)")
+        for name, ms in tool_timings:
+            print(f"  {name}: {ms:.2f}ms")
+    print(f"total: {llm_ms + tools_ms:.2f}ms")
+
+
 def _load_dotenv_fallback(path: str) -> None:
     if not os.path.exists(path):
         return
@@ -158,8 +199,6 @@ async def main():
         "请通过MCP计算 2+3，并返回结果。",
     )
 
-    client = OpenAI(api_key=api_key, base_url=base_url)
-
     messages = [
         {
             "role": "system",
@@ -172,42 +211,66 @@ async def main():
     ]
 
     tools = _tool_defs()
+    turns = []
 
-    while True:
-        print("\n--- LLM request ---")
-        print("user_query:", user_query)
-        resp = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            tools=tools,
-        )
-        msg = resp.choices[0].message
-        if not msg.tool_calls:
-            print("\n--- LLM final response ---")
-            print(msg.content)
-            break
-
-        print("\n--- LLM tool calls ---")
-        for call in msg.tool_calls:
-            print("tool:", call.function.name)
-            print("args:", call.function.arguments)
-        messages.append(msg)
-        for tool_call in msg.tool_calls:
-            name = tool_call.function.name
-            args = json.loads(tool_call.function.arguments or "{}")
-            print("\n--- MCP call ---")
-            print("tool:", name)
-            print("args:", args)
-            result = await _call_gateway_tool(mcp_url, name, args)
-            print("--- MCP result ---")
-            print(result)
-            messages.append(
-                {
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "content": json.dumps(result, ensure_ascii=False),
-                }
+    async with (
+        AsyncOpenAI(api_key=api_key, base_url=base_url) as client,
+        _gateway_client() as gateway,
+    ):
+        while True:
+            print("\n--- LLM request ---")
+            print("user_query:", user_query)
+            t0 = time.perf_counter()
+            resp = await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                tools=tools,
             )
+            llm_ms = _ms(time.perf_counter() - t0)
+            msg = resp.choices[0].message
+            if not msg.tool_calls:
+                turns.append((llm_ms, 0.0))
+                _print_turn_timing(len(turns), llm_ms, 0.0, [])
+                print("\n--- LLM final response ---")
+                print(msg.content)
+                break
+
+            print("\n--- LLM tool calls ---")
+            for call in msg.tool_calls:
+                print("tool:", call.function.name)
+                print("args:", call.function.arguments)
+            messages.append(msg)
+
+            # Tool calls from one turn are independent, so run them concurrently.
+            t0 = time.perf_counter()
+            outcomes = await asyncio.gather(
+                *(_run_tool_call(gateway, mcp_url, call) for call in msg.tool_calls)
+            )
+            tools_ms = _ms(time.perf_counter() - t0)
+
+            for tool_call, (name, args, result, _) in zip(msg.tool_calls, outcomes):
+                print("\n--- MCP call ---")
+                print("tool:", name)
+                print("args:", args)
+                print("--- MCP result ---")
+                print(result)
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "content": json.dumps(result, ensure_ascii=False),
+                    }
+                )
+            turns.append((llm_ms, tools_ms))
+            _print_turn_timing(
+                len(turns), llm_ms, tools_ms, [(name, ms) for name, _, _, ms in outcomes]
+            )
+
+    llm_total = sum(llm for llm, _ in turns)
+    tools_total = sum(tools for _, tools in turns)
+    print("\n--- Agent timing ---")
+    print(f"turns: {len(turns)}")
+    print(f"llm: {llm_total:.2f}ms tools: {tools_total:.2f}ms total: {llm_total + tools_total:.2f}ms")
 
 
 asyncio.run(main())